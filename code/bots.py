@@ -0,0 +1,54 @@
+# filename: /workspaces/twitterbotscraper/code/bots.py
+import os, json
+from urllib.parse import urlparse
+
+# --- PORTABLE CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BOTS_PATH = os.path.join(BASE_DIR, "bots.json")
+
+# Used for every key a bot leaves out, and as the only bot when bots.json is missing.
+DEFAULT_BOT = {
+    "name": "formula",
+    "sources": [],           # source domains this bot reads, empty means every source
+    "rules": {},             # per-domain rule keys that replace those in the script's SITE_RULES
+    "select_count": 21,      # articles step3 keeps for this bot
+    "select_prompt": None,   # prompt file (relative to code/) for step3, '{count}' is filled in
+    "post_prompt": None,     # prompt file (relative to code/) for step4
+    "hashtags": "#formula1 #f1 #f1twt",
+}
+
+def load_bots(path=BOTS_PATH):
+    if not os.path.exists(path): return [dict(DEFAULT_BOT)]
+    with open(path, "r", encoding="utf-8") as f: raw = json.load(f)
+    bots = [{**DEFAULT_BOT, **b} for b in raw]
+    if not bots: raise ValueError(f"No bots defined in {path}")
+    names = [b["name"] for b in bots]
+    if len(set(names)) != len(names): raise ValueError(f"Duplicate bot names in {path}: {names}")
+    return bots
+
+def source_domain(url): return urlparse(url).netloc.replace('www.', '')
+
+def covers_source(bot, domain): return not bot["sources"] or domain in bot["sources"]
+
+def union_sources(bots, sources):
+    """Sources read by at least one bot, so a shared crawl fetches each of them once."""
+    return [s for s in sources if any(covers_source(b, source_domain(s)) for b in bots)]
+
+def rule_for(bot, domain, site_rules):
+    base, override = site_rules.get(domain), bot["rules"].get(domain)
+    if base is None and override is None: return None
+    return {**(base or {}), **(override or {})}
+
+def wants_url(bot, url, domain, site_rules, is_valid):
+    """True if url, found on a source of `domain`, passes this bot's sources and rules."""
+    if not covers_source(bot, domain): return False
+    rule = rule_for(bot, domain, site_rules)
+    return bool(rule) and is_valid(url, domain, rule)
+
+def articles_for(bot, articles):
+    """Articles tagged for this bot; untagged articles (older runs) go to every bot."""
+    return [a for a in articles if not a.get("bots") or bot["name"] in a["bots"]]
+
+def load_prompt(bot, key, default):
+    if not bot.get(key): return default
+    with open(os.path.join(BASE_DIR, bot[key]), "r", encoding="utf-8") as f: return f.read()
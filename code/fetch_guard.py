@@ -0,0 +1,124 @@
+# filename: /workspaces/twitterbotscraper/code/fetch_guard.py
+import os, json, time, random, requests
+from urllib.parse import urlparse
+
+# --- PORTABLE CONFIG ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_PATH = os.path.join(BASE_DIR, "domain-state.json")
+
+# --- BREAKER & RETRY SETTINGS ---
+FAILURE_THRESHOLD = 3          # consecutive failed fetches before a domain is skipped
+BASE_COOLDOWN = 30 * 60        # seconds a tripped domain is skipped, doubled on every further failure
+MAX_COOLDOWN = 24 * 60 * 60
+MAX_ATTEMPTS = 2               # per fetch, first try included
+RETRY_BUDGET = 10              # retries allowed per DomainGuard (one per script) across all domains
+BACKOFF_BASE = 2.0             # seconds, upper bound of the first jittered retry delay
+BLOCKED_STATUSES = {401, 403}  # the site is refusing us, retrying right away will not help
+
+class FetchError(Exception):
+    """Raised by fetchers (e.g. Playwright) that get an HTTP error status without an exception."""
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+def domain_of(url): return urlparse(url).netloc.replace('www.', '')
+
+def status_of(exc):
+    if isinstance(exc, FetchError): return exc.status
+    if isinstance(exc, requests.HTTPError) and exc.response is not None: return exc.response.status_code
+    return None
+
+def playwright_errors():
+    # Imported lazily so the requests-only scripts (main_d.py) don't load Playwright.
+    try: from playwright.sync_api import Error, TimeoutError
+    except ImportError: return None, None
+    return Error, TimeoutError
+
+def classify(exc):
+    """
+    Sorts a fetch exception into 'transient' (retry, counts against the domain),
+    'dead' (no retry, counts against the domain: timeouts, 401/403),
+    'permanent' (no retry, page-level only, e.g. a 404 or a redirect loop)
+    or None for anything that isn't a requests/Playwright error, which the caller should let propagate.
+    """
+    status = status_of(exc)
+    if status is not None:
+        if status == 429 or status >= 500: return "transient"
+        if status in BLOCKED_STATUSES: return "dead"
+        return "permanent"
+    pw_error, pw_timeout = playwright_errors()
+    # Retrying a timeout only doubles what a dead host costs us, so it goes straight to the breaker.
+    if isinstance(exc, requests.Timeout) or (pw_timeout and isinstance(exc, pw_timeout)): return "dead"
+    if isinstance(exc, requests.ConnectionError) or (pw_error and isinstance(exc, pw_error)): return "transient"
+    if isinstance(exc, requests.RequestException): return "permanent"
+    return None
+
+class DomainGuard:
+    """
+    Per-domain circuit breaker with a persistent state file, shared by every fetch stage.
+    A domain is skipped for a cooldown once it fails FAILURE_THRESHOLD times in a row; the
+    cooldown doubles on each failure after that and resets on the first success.
+    """
+    def __init__(self, path=STATE_PATH, retry_budget=RETRY_BUDGET):
+        self.path = path
+        self.retry_budget = retry_budget
+        self.state = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path): return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"🟡 WARNING: Could not read {self.path}, starting with a clean state. Reason: {e}")
+            return {}
+
+    def save(self):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=4, sort_keys=True)
+
+    def is_open(self, domain):
+        entry = self.state.get(domain)
+        return bool(entry) and entry.get("open_until", 0) > time.time()
+
+    def record_success(self, domain):
+        self.state.pop(domain, None)
+
+    def record_failure(self, domain, reason):
+        entry = self.state.setdefault(domain, {"failures": 0, "open_until": 0})
+        entry["failures"] += 1
+        entry["last_error"] = str(reason)[:200]
+        if entry["failures"] >= FAILURE_THRESHOLD:
+            cooldown = min(BASE_COOLDOWN * 2 ** (entry["failures"] - FAILURE_THRESHOLD), MAX_COOLDOWN)
+            entry["open_until"] = time.time() + cooldown
+            print(f"🟠 Circuit open for {domain} after {entry['failures']} failures, skipping it for {cooldown // 60} min.")
+
+    def fetch(self, url, fn, attempts=MAX_ATTEMPTS):
+        """Runs fn(url) under the breaker for url's domain. Returns fn's result, or None if skipped or failed.
+        Exceptions that are not requests/Playwright errors (bugs in fn) propagate untouched."""
+        domain = domain_of(url)
+        if self.is_open(domain):
+            print(f"⏭️ Skipping {url}: circuit open for {domain}.")
+            return None
+        # A domain coming out of cooldown gets a single probe, not a full retry cycle.
+        if self.state.get(domain, {}).get("failures", 0) >= FAILURE_THRESHOLD: attempts = 1
+
+        for attempt in range(1, attempts + 1):
+            try:
+                result = fn(url)
+            except Exception as e:
+                kind = classify(e)
+                if kind is None: raise
+                if kind == "permanent":
+                    print(f"🔴 ERROR: Could not fetch {url}. Reason: {e}")
+                    return None
+                if kind == "transient" and attempt < attempts and self.retry_budget > 0:
+                    self.retry_budget -= 1
+                    delay = random.uniform(0, BACKOFF_BASE * 2 ** (attempt - 1))
+                    print(f"🟡 Retrying {url} in {delay:.1f}s ({attempt}/{attempts - 1}). Reason: {e}")
+                    time.sleep(delay)
+                    continue
+                print(f"🔴 ERROR: Could not fetch {url}. Reason: {e}")
+                self.record_failure(domain, e)
+                return None
+            self.record_success(domain)
+            return result
@@ -1,9 +1,12 @@
 import os
 
+# Config and state persist across runs, everything else is per-run output.
+KEEP_FILES = {"domain-state.json", "bots.json"}
+
 def clean_json():
     directory = "code"
     for filename in os.listdir(directory):
-        if filename.endswith(".json"):
+        if filename.endswith(".json") and filename not in KEEP_FILES:
             os.remove(os.path.join(directory, filename))
 
 if __name__ == "__main__":
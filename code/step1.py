@@ -3,6 +3,8 @@ import os, time, json, hashlib, requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urljoin
 from playwright.sync_api import sync_playwright
+from fetch_guard import DomainGuard, FetchError
+from bots import load_bots, union_sources, covers_source, rule_for
 
 # --- PORTABLE CONFIG ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -43,33 +45,46 @@ def is_valid(url, domain, rule):
     if rule.get('min_hyphens') and parsed.path.count('-') < rule['min_hyphens']: return False
     return True
 
-def get_html(url, domain):
+def launch_browser():
+    # Outside the domain guard: a broken local install must not count against the sites.
+    p = sync_playwright().start()
+    try: return p, p.chromium.launch(headless=True)
+    except Exception as e:
+        print(f"🔴 Could not launch Playwright, skipping dynamic sites. Reason: {e}")
+        p.stop()
+        return None, None
+
+def get_html(url, domain, browser):
     if any(s in domain for s in PLAYWRIGHT_SITES):
+        pg = browser.new_page(user_agent=HEADERS['User-Agent'])
         try:
-            with sync_playwright() as p:
-                b = p.chromium.launch(headless=True)
-                pg = b.new_page(user_agent=HEADERS['User-Agent'])
-                pg.goto(url, timeout=30000, wait_until='domcontentloaded')
-                time.sleep(2)
-                h = pg.content()
-                b.close()
-                return h
-        except: return None
-    try: return requests.get(url, headers=HEADERS, timeout=15).content
-    except: return None
+            resp = pg.goto(url, timeout=30000, wait_until='domcontentloaded')
+            if resp and resp.status >= 400: raise FetchError(resp.status, url)
+            time.sleep(2)
+            return pg.content()
+        finally: pg.close()
+    r = requests.get(url, headers=HEADERS, timeout=15)
+    r.raise_for_status()
+    return r.content
 
 def main():
     if not os.path.exists(SOURCES_PATH): return
     with open(SOURCES_PATH, "r") as f: sources = [l.strip() for l in f if l.strip() and not l.startswith("#")]
+    bots = load_bots()
+    sources = union_sources(bots, sources)
     
     history = set()
     if os.path.exists(RAW_URLS_PATH):
         with open(RAW_URLS_PATH, "r") as f: history = {l.strip() for l in f if l.strip()}
 
-    new_items, all_urls = [], set(history)
+    guard = DomainGuard()
+    needs_browser = any(s in src for src in sources for s in PLAYWRIGHT_SITES)
+    p, browser = launch_browser() if needs_browser else (None, None)
+    new_items, all_urls = {}, set(history)  # url -> item, one entry per article however many bots want it
     for src in sources:
         dom = urlparse(src).netloc.replace('www.', '')
-        html = get_html(src, dom)
+        if any(s in dom for s in PLAYWRIGHT_SITES) and not browser: continue
+        html = guard.fetch(src, lambda u: get_html(u, dom, browser))
         if not html: continue
         
         soup = BeautifulSoup(html, 'lxml')
@@ -81,16 +96,21 @@ def main():
             full = urljoin(base, a['href']).split('?')[0].rstrip('/')
             if full not in raw_links: raw_links.append(full)
         
-        rule = SITE_RULES.get(dom)
-        if rule:
+        for bot in bots:
+            if not covers_source(bot, dom): continue
+            rule = rule_for(bot, dom, SITE_RULES)
+            if not rule: continue
             # Filter and take top 5
             valid_links = [l for l in raw_links if is_valid(l, dom, rule)][:5]
             for l in valid_links:
                 all_urls.add(l)
                 if l not in history:
-                    new_items.append({"id": generate_id(l), "url": l, "domain": dom})
+                    item = new_items.setdefault(l, {"id": generate_id(l), "url": l, "domain": dom, "bots": []})
+                    if bot["name"] not in item["bots"]: item["bots"].append(bot["name"])
 
-    with open(NEW_URLS_JSON, "w") as f: json.dump(new_items, f, indent=4)
+    if browser: browser.close(); p.stop()
+    guard.save()
+    with open(NEW_URLS_JSON, "w") as f: json.dump(list(new_items.values()), f, indent=4)
     with open(RAW_URLS_PATH, "w") as f: f.write("\n".join(sorted(list(all_urls))))
     print(f"✅ Found {len(new_items)} new articles.")
 
@@ -3,6 +3,7 @@ import os
 from bs4 import BeautifulSoup
 from readability import Document
 from playwright.sync_api import sync_playwright
+from fetch_guard import DomainGuard, FetchError
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_FILE = os.path.join(BASE_DIR, "new-urls.json")
@@ -49,6 +50,7 @@ def main():
     final_data =[]
     success_count = 0
     failure_count = 0
+    guard = DomainGuard()
     
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
@@ -57,12 +59,21 @@ def main():
         )
         page = context.new_page()
         
+        def load_page(url):
+            resp = page.goto(url, timeout=45000, wait_until="domcontentloaded")
+            if resp and resp.status >= 400:
+                raise FetchError(resp.status, url)
+            page.wait_for_timeout(2000) # Allow JS to load dynamic content
+            return page.content()
+        
         for item in data:
             url = item.get("url")
             try:
-                page.goto(url, timeout=45000, wait_until="domcontentloaded")
-                page.wait_for_timeout(2000) # Allow JS to load dynamic content
-                html = page.content()
+                html = guard.fetch(url, load_page)
+                if not html:
+                    failure_count += 1
+                    print(f"[FAILED] Could not load: {url}")
+                    continue
                 
                 title, hero_image, content = extract_data(html)
                 
@@ -71,6 +82,7 @@ def main():
                     final_data.append({
                         "id": item["id"],
                         "domain": item.get("domain"), # Preserving the domain
+                        "bots": item.get("bots", []), # Bots this article fans out to in step3
                         "title": title,
                         "hero_image": hero_image,
                         "content": content
@@ -86,6 +98,8 @@ def main():
                 print(f"[FAILED] Error processing {url}: {e}")
 
         browser.close()
+    
+    guard.save()
             
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         json.dump(final_data, f, indent=4, ensure_ascii=False)
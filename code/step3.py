@@ -1,7 +1,9 @@
 import os
 import json
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from google.genai import types
+from bots import load_bots, articles_for, load_prompt
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_JSON = os.path.join(BASE_DIR, "final_articles.json")
@@ -12,7 +14,7 @@ SYSTEM_PROMPT = """
 You are a cynical F1 social media strategist aiming for maximum viral engagement.
 Analyze the provided IDs and Titles.
 
-1. CRITERIA: Select the 21 most "spicy" items. Focus on:
+1. CRITERIA: Select the {count} most "spicy" items. Focus on:
    - Driver/Team drama or "war of words".
    - Controversial steward decisions or FIA bias.
    - Shocking rumors or major technical failures.
@@ -22,17 +24,51 @@ Analyze the provided IDs and Titles.
    - You MUST recognize when different titles describe the same event and pick only ONE ID for that topic.
    - Every single ID in your final list must represent a completely unique news story.
 
-3. UNIQUENESS: Ensure each of the 21 selected IDs represents a different, unique news topic.
+3. UNIQUENESS: Ensure each of the {count} selected IDs represents a different, unique news topic.
 
 4. EXCLUSIONS: Skip standard race results, practice times, weather updates, or generic PR quotes.
 
-5. OUTPUT: Return ONLY a JSON list of the 21 chosen IDs: ["id1", "id2", ...]
+5. OUTPUT: Return ONLY a JSON list of the {count} chosen IDs: ["id1", "id2", ...]
 """
 
 def get_api_key():
     if not os.path.exists(KEY_PATH): return None
     with open(KEY_PATH, "r") as f: return f.read().strip()
 
+def select_for_bot(client, bot, full_data):
+    name, count = bot["name"], bot["select_count"]
+    articles = articles_for(bot, full_data)
+    if not articles: return []
+
+    # Check if we should skip Gemini
+    if len(articles) <= count:
+        selected = articles
+        print(f"✅ [{name}] Items count ({len(articles)}) <= {count}. Keeping all.")
+    else:
+        if not client:
+            print(f"🔴 [{name}] No API key, skipping selection.")
+            return []
+        prompt = load_prompt(bot, "select_prompt", SYSTEM_PROMPT).replace("{count}", str(count))
+        input_to_gemini = [{"id": item["id"], "title": item["title"]} for item in articles]
+        try:
+            response = client.models.generate_content(
+                model="gemini-3.1-flash-lite-preview",
+                contents=json.dumps(input_to_gemini),
+                config=types.GenerateContentConfig(
+                    system_instruction=prompt,
+                    response_mime_type="application/json"
+                )
+            )
+            spicy_ids = json.loads(response.text)
+            selected = [item for item in articles if item["id"] in spicy_ids]
+            print(f"✅ [{name}] Successfully filtered {len(selected)} unique spicy items using Gemini.")
+        except Exception as e:
+            print(f"🔴 [{name}] Error: {e}")
+            return []
+
+    # One entry per (article, bot), tagged like main_d.py tags its rows
+    return [{**{k: v for k, v in item.items() if k != "bots"}, "bot": name} for item in selected]
+
 def main():
     if not os.path.exists(INPUT_JSON): return
     with open(INPUT_JSON, "r", encoding="utf-8") as f:
@@ -40,39 +76,19 @@ def main():
 
     if not full_data: return
 
-    # Check if we should skip Gemini
-    if len(full_data) <= 21:
-        with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-            json.dump(full_data, f, indent=4, ensure_ascii=False)
-        print(f"✅ Items count ({len(full_data)}) <= 21. Saved directly to {OUTPUT_JSON}.")
-        return
-
+    bots = load_bots()
     api_key = get_api_key()
-    if not api_key: return
-    client = genai.Client(api_key=api_key)
-
-    input_to_gemini = [{"id": item["id"], "title": item["title"]} for item in full_data]
-
-    try:
-        response = client.models.generate_content(
-            model="gemini-3.1-flash-lite-preview",
-            contents=json.dumps(input_to_gemini),
-            config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
-                response_mime_type="application/json"
-            )
-        )
-        
-        spicy_ids = json.loads(response.text)
-        final_list = [item for item in full_data if item["id"] in spicy_ids]
-
-        with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
-            json.dump(final_list, f, indent=4, ensure_ascii=False)
-            
-        print(f"✅ Successfully filtered {len(final_list)} unique spicy items using Gemini.")
-
-    except Exception as e:
-        print(f"🔴 Error: {e}")
+    client = genai.Client(api_key=api_key) if api_key else None
+
+    # Extraction already ran once for every bot, only the selection is per bot
+    with ThreadPoolExecutor(max_workers=len(bots)) as executor:
+        results = list(executor.map(lambda bot: select_for_bot(client, bot, full_data), bots))
+    final_list = [item for bot_items in results for item in bot_items]
+
+    with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
+        json.dump(final_list, f, indent=4, ensure_ascii=False)
+
+    print(f"✅ Saved {len(final_list)} items for {len(bots)} bot(s) to {OUTPUT_JSON}.")
 
 if __name__ == "__main__":
     main()
@@ -2,8 +2,10 @@ import os
 import json
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor
 from google import genai
 from google.genai import types
+from bots import load_bots, load_prompt
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 INPUT_JSON = os.path.join(BASE_DIR, "spicy_news.json")
@@ -37,14 +39,14 @@ def get_api_key():
     if not os.path.exists(KEY_PATH): return None
     with open(KEY_PATH, "r") as f: return f.read().strip()
 
-def process_batch(client, batch_data):
+def process_batch(client, batch_data, prompt):
     input_payload = [{"id": item["id"], "title": item["title"], "content": item["content"]} for item in batch_data]
     try:
         response = client.models.generate_content(
             model="gemini-3.1-flash-lite-preview",
             contents=json.dumps(input_payload),
             config=types.GenerateContentConfig(
-                system_instruction=SYSTEM_PROMPT,
+                system_instruction=prompt,
                 response_mime_type="application/json"
             )
         )
@@ -56,32 +58,25 @@ def process_batch(client, batch_data):
         print(f"🔴 AI Batch Error: {e}")
         return {}
 
-def main():
-    api_key = get_api_key()
-    if not api_key: return
-    client = genai.Client(api_key=api_key)
-
-    if not os.path.exists(INPUT_JSON): return
-    with open(INPUT_JSON, "r", encoding="utf-8") as f:
-        valid_data = json.load(f)
-
-    if not valid_data: return
+def generate_for_bot(client, bot, items):
+    name = bot["name"]
+    prompt = load_prompt(bot, "post_prompt", SYSTEM_PROMPT)
 
     all_tweets = {}
     batch_size = 5
-    for i in range(0, len(valid_data), batch_size):
-        batch = valid_data[i : i + batch_size]
-        print(f"Processing batch {i//batch_size + 1} ({len(batch)} items)...")
-        batch_results = process_batch(client, batch)
+    for i in range(0, len(items), batch_size):
+        batch = items[i : i + batch_size]
+        print(f"[{name}] Processing batch {i//batch_size + 1} ({len(batch)} items)...")
+        batch_results = process_batch(client, batch, prompt)
         all_tweets.update(batch_results)
-        if i + batch_size < len(valid_data):
+        if i + batch_size < len(items):
             time.sleep(5)
 
     final_output = []
     # We remove domain from the final JSON but use it for the suffix
     keys_to_remove = {"id", "title", "content", "domain"}
 
-    for item in valid_data:
+    for item in items:
         item_id = item["id"]
         if item_id in all_tweets:
             generated = all_tweets[item_id] # [summary, tweet]
@@ -91,7 +86,7 @@ def main():
             clean_domain = raw_domain.replace("www.", "").replace(".com", "")
             
             # 2. Append required suffix to the Summary (generated[0])
-            suffix = f" #formula1 #f1 #f1twt #{clean_domain}"
+            suffix = f" {bot['hashtags']} #{clean_domain}"
             generated[0] = f"{generated[0]}{suffix}"
             
             # 3. Build final item
@@ -99,10 +94,33 @@ def main():
             cleaned_item["generated_tweets"] = [item["title"]] + generated
             final_output.append(cleaned_item)
 
+    return final_output
+
+def main():
+    api_key = get_api_key()
+    if not api_key: return
+    client = genai.Client(api_key=api_key)
+
+    if not os.path.exists(INPUT_JSON): return
+    with open(INPUT_JSON, "r", encoding="utf-8") as f:
+        valid_data = json.load(f)
+
+    if not valid_data: return
+
+    # step3 tags every item with the bot that selected it, bots run their batches in parallel
+    bots = [b for b in load_bots() if any(item.get("bot") == b["name"] for item in valid_data)]
+    if not bots: return
+    with ThreadPoolExecutor(max_workers=len(bots)) as executor:
+        results = list(executor.map(
+            lambda bot: generate_for_bot(client, bot, [item for item in valid_data if item.get("bot") == bot["name"]]),
+            bots
+        ))
+    final_output = [item for bot_items in results for item in bot_items]
+
     with open(OUTPUT_JSON, "w", encoding="utf-8") as f:
         json.dump(final_output, f, indent=4, ensure_ascii=False)
 
-    print(f"✅ Finished. Appended domain tags to {len(final_output)} summaries.")
+    print(f"✅ Finished. Appended domain tags to {len(final_output)} summaries for {len(bots)} bot(s).")
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,19 @@
 # filename: main.py
 
 import requests
+import json
 from bs4 import BeautifulSoup
 import os
+import sys
 import time
 from urllib.parse import urlparse, urljoin
 from supabase import create_client, Client
 from playwright.sync_api import sync_playwright
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "code"))
+from fetch_guard import DomainGuard, FetchError
+from bots import load_bots, union_sources, wants_url
+
 # --- HEADERS, SITE RULES & PLAYWRIGHT SITES (Unchanged) ---
 HEADERS = { 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36', 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9', 'Accept-Language': 'en-US,en;q=0.9', 'Accept-Encoding': 'gzip, deflate, br', 'Connection': 'keep-alive' }
 SITE_RULES = {
@@ -61,6 +67,11 @@ def save_new_links(links: set, filename="new-urls.txt"):
     with open(filename, "w", encoding="utf-8") as f:
         f.write("\n".join(sorted(list(links))))
 
+def save_link_bots(link_bots: dict, filename="new-urls-bots.json"):
+    """Writes which bots each new link is for, so main_d.py doesn't have to re-apply the rules."""
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump(link_bots, f, indent=4, sort_keys=True)
+
 # --- URL VALIDATION & SCRAPING ---
 def clean_url(url: str, base_url: str) -> str:
     full_url = urljoin(base_url, url)
@@ -77,56 +88,75 @@ def is_valid_article_link_by_rule(url: str, domain: str, rule: dict) -> bool:
     if min_hyphens is not None and parsed_url.path.count('-') < min_hyphens: return False
     return True
 
-def get_html_with_playwright(url: str) -> str:
+def launch_browser():
+    """Starts Chromium once, outside the domain guard: a broken local install must not count against the sites."""
+    playwright = sync_playwright().start()
     try:
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            page = browser.new_page(user_agent=HEADERS['User-Agent'])
-            page.goto(url, timeout=30000, wait_until='domcontentloaded')
-            page.wait_for_selector("body", timeout=15000)
-            time.sleep(3)
-            html_content = page.content()
-            browser.close()
-            return html_content
+        return playwright, playwright.chromium.launch(headless=True)
     except Exception as e:
-        print(f"🔴 ERROR: Playwright failed for {url}. Reason: {e}")
-        return ""
+        print(f"🔴 ERROR: Could not launch Playwright, dynamic sites are skipped this run. Reason: {e}")
+        playwright.stop()
+        return None, None
 
-def scrape_and_filter_links(sources_to_scrape: list[str]) -> set:
+def get_html_with_playwright(url: str, browser) -> str:
+    page = browser.new_page(user_agent=HEADERS['User-Agent'])
+    try:
+        response = page.goto(url, timeout=30000, wait_until='domcontentloaded')
+        if response and response.status >= 400:
+            raise FetchError(response.status, url)
+        page.wait_for_selector("body", timeout=15000)
+        time.sleep(3)
+        return page.content()
+    finally:
+        page.close()
+
+def get_html_with_requests(url: str, session: requests.Session) -> bytes:
+    response = session.get(url, timeout=15)
+    response.raise_for_status()
+    return response.content
+
+def scrape_and_filter_links(sources_to_scrape: list[str], bots: list[dict]) -> dict[str, list[str]]:
     session = requests.Session()
     session.headers.update(HEADERS)
-    live_links = set()
+    guard = DomainGuard()
+    live_links = {}  # link -> names of the bots whose sources and rules accept it
+    needs_browser = any(site in source_url for source_url in sources_to_scrape for site in PLAYWRIGHT_SITES)
+    playwright, browser = launch_browser() if needs_browser else (None, None)
     
     for i, source_url in enumerate(sources_to_scrape):
         domain = urlparse(source_url).netloc.replace('www.', '')
         print(f"\n[{i+1}/{len(sources_to_scrape)}] Scraping: {domain}...")
-        html_content = None
-        try:
-            if any(site in domain for site in PLAYWRIGHT_SITES):
-                print("...using Playwright (dynamic content)")
-                html_content = get_html_with_playwright(source_url)
-            else:
-                print("...using Requests (static content)")
-                response = session.get(source_url, timeout=15)
-                response.raise_for_status()
-                html_content = response.content
-            
-            if not html_content: continue
-
-            soup = BeautifulSoup(html_content, 'lxml')
-            base_url = f"{urlparse(source_url).scheme}://{urlparse(source_url).netloc}"
-            found_links = {clean_url(a['href'], base_url) for a in soup.find_all('a', href=True)}
-            
-            rule = SITE_RULES.get(domain)
-            if not rule: continue
-                
-            valid_for_domain = {link for link in found_links if is_valid_article_link_by_rule(link, domain, rule)}
-            print(f"    -> Found {len(valid_for_domain)} valid articles for {domain}.")
-            live_links.update(valid_for_domain)
-
-        except requests.RequestException as e:
-            print(f"🔴 ERROR: Could not fetch {source_url}. Reason: {e}")
-            
+        if any(site in domain for site in PLAYWRIGHT_SITES):
+            if not browser:
+                print("...skipped, Playwright is not available")
+                continue
+            print("...using Playwright (dynamic content)")
+            html_content = guard.fetch(source_url, lambda u: get_html_with_playwright(u, browser))
+        else:
+            print("...using Requests (static content)")
+            html_content = guard.fetch(source_url, lambda u: get_html_with_requests(u, session))
+        
+        if not html_content: continue
+
+        soup = BeautifulSoup(html_content, 'lxml')
+        base_url = f"{urlparse(source_url).scheme}://{urlparse(source_url).netloc}"
+        found_links = {clean_url(a['href'], base_url) for a in soup.find_all('a', href=True)}
+        
+        # One crawl for every bot: keep links that any bot's sources and rules accept
+        valid_for_domain = 0
+        for link in found_links:
+            names = [bot['name'] for bot in bots if wants_url(bot, link, domain, SITE_RULES, is_valid_article_link_by_rule)]
+            if not names: continue
+            valid_for_domain += 1
+            known = live_links.setdefault(link, [])
+            known.extend(n for n in names if n not in known)
+        if not valid_for_domain: continue
+        print(f"    -> Found {valid_for_domain} valid articles for {domain}.")
+
+    if browser:
+        browser.close()
+        playwright.stop()
+    guard.save()
     return live_links
 
 # --- MAIN EXECUTION ---
@@ -135,12 +165,14 @@ def main():
     supabase = init_connection()
     if not supabase: sys.exit(1)
 
-    sources = get_sources_from_db(supabase)
+    bots = load_bots()
+    sources = union_sources(bots, get_sources_from_db(supabase))
     if not sources:
         print("No sources found. Exiting.")
         return
 
-    live_links = scrape_and_filter_links(sources)
+    link_bots = scrape_and_filter_links(sources, bots)
+    live_links = set(link_bots)
     old_links = read_links_from_file()
     new_links = live_links - old_links
 
@@ -149,6 +181,7 @@ def main():
     else:
         print(f"\n✅ Found {len(new_links)} new links.")
         save_new_links(new_links)
+        save_link_bots({link: link_bots[link] for link in new_links})
 
     save_links_to_file(live_links)
     print(f"Updated 'raw-urls.txt' with {len(live_links)} total links.")
@@ -2,6 +2,7 @@
 
 import os
 import sys
+import json
 from supabase import create_client, Client
 from datetime import datetime, timedelta
 import pytz
@@ -10,6 +11,10 @@ import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "code"))
+from fetch_guard import DomainGuard
+from bots import load_bots, articles_for
+
 HEADERS = { 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/108.0.0.0 Safari/537.36' }
 
 def init_connection() -> Client:
@@ -27,20 +32,30 @@ def read_new_links_from_file(filename="new-urls.txt") -> set:
     with open(filename, "r", encoding="utf-8") as f:
         return {line.strip() for line in f if line.strip()}
 
-def get_og_title(url: str, session: requests.Session) -> str | None:
+def read_link_bots(filename="new-urls-bots.json") -> dict:
+    """Bot names per link, as decided by main.py's crawl. Missing file means every bot."""
+    if not os.path.exists(filename):
+        print(f"🟡 No '{filename}' file found. Links go to every bot.")
+        return {}
+    with open(filename, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def get_og_title(url: str, session: requests.Session, guard: DomainGuard) -> str | None:
     """Fetches the Open Graph title from a URL."""
-    try:
-        response = session.get(url, timeout=10)
+    def fetch(u):
+        response = session.get(u, timeout=10)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'lxml')
-        og_title_tag = soup.find('meta', property='og:title')
-        if og_title_tag and og_title_tag.get('content'):
-            return og_title_tag['content'].strip()
-        print(f"🟡 WARNING: No og:title found for {url}")
-        return None
-    except requests.RequestException as e:
-        print(f"🔴 ERROR: Could not fetch {url}. Reason: {e}")
+        return response.content
+
+    content = guard.fetch(url, fetch)
+    if not content:
         return None
+    soup = BeautifulSoup(content, 'lxml')
+    og_title_tag = soup.find('meta', property='og:title')
+    if og_title_tag and og_title_tag.get('content'):
+        return og_title_tag['content'].strip()
+    print(f"🟡 WARNING: No og:title found for {url}")
+    return None
 
 def process_urls(urls: set) -> list:
     """
@@ -50,9 +65,10 @@ def process_urls(urls: set) -> list:
     processed_data = []
     session = requests.Session()
     session.headers.update(HEADERS)
+    guard = DomainGuard()
     
     for url in urls:
-        title = get_og_title(url, session)
+        title = get_og_title(url, session, guard)
         if title:
             publication = urlparse(url).netloc.replace('www.', '')
             formatted_title = f'"{title}" -{publication}'
@@ -60,30 +76,42 @@ def process_urls(urls: set) -> list:
         else:
             # URL is discarded if title can't be extracted
             print(f"Discarding URL due to missing title: {url}")
-            
+    
+    guard.save()
     return processed_data
 
-def assign_timestamps_and_bot(processed_data: list) -> list:
-    """Assigns timestamps and bot name to the processed data."""
+def assign_timestamps_and_bot(processed_data: list, bots: list) -> list:
+    """
+    Fans the processed data out to the bots each item is tagged for,
+    and assigns each bot's rows timestamps spread over the next 3 hours.
+    """
     if not processed_data:
         return []
     
     utc = pytz.utc
     now = datetime.now(utc)
     
-    count = len(processed_data)
-    step = timedelta(hours=3) / (count - 1) if count > 1 else timedelta(hours=0)
-    
-    random.shuffle(processed_data)
+    names = {bot['name'] for bot in bots}
+    for item in processed_data:
+        if item.get('bots') and not names.intersection(item['bots']):
+            print(f"🟡 WARNING: No configured bot for {item['url']} (tagged {item['bots']}), discarding it.")
     
     final_payload = []
-    for i, item in enumerate(processed_data):
-        timestamp_dt = now + i * step
+    for bot in bots:
+        bot_items = [{k: v for k, v in item.items() if k != 'bots'} for item in articles_for(bot, processed_data)]
         
-        # Set time to ISO 8601 format
-        item['time'] = timestamp_dt.isoformat()
-        item['bot'] = 'formula'
-        final_payload.append(item)
+        count = len(bot_items)
+        step = timedelta(hours=3) / (count - 1) if count > 1 else timedelta(hours=0)
+        
+        random.shuffle(bot_items)
+        
+        for i, item in enumerate(bot_items):
+            timestamp_dt = now + i * step
+            
+            # Set time to ISO 8601 format
+            item['time'] = timestamp_dt.isoformat()
+            item['bot'] = bot['name']
+            final_payload.append(item)
         
     return final_payload
 
@@ -112,7 +140,10 @@ def main():
         print("--- Processor Finished: No URLs had valid titles. ---")
         return
 
-    final_payload = assign_timestamps_and_bot(processed_data)
+    link_bots = read_link_bots()
+    for item in processed_data:
+        item['bots'] = link_bots.get(item['url'], [])
+    final_payload = assign_timestamps_and_bot(processed_data, load_bots())
     
     supabase = init_connection()
     if not supabase: